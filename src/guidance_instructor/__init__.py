@@ -1 +1 @@
-from .guidance_instructor import generate_object
+from .guidance_instructor import GuidanceExtractor, generate_object
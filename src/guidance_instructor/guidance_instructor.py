@@ -1,9 +1,19 @@
+import functools
+import json
+import operator
 import re
 from enum import Enum
 from types import GenericAlias, NoneType
 from typing import Tuple, Type, Union, _UnionGenericAlias
 
 import yaml
+
+try:
+    # The libyaml bindings are ~10x faster; fall back to pure Python.
+    from yaml import CSafeDumper as _SafeDumper, CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper, SafeLoader as _SafeLoader
+
 from pydantic import BaseModel
 from pydantic.fields import FieldInfo
 
@@ -11,16 +21,67 @@ import guidance
 from guidance.models import Model
 
 
-UNESCAPED_STRING_CHARS = (
-    r"abcdefghijklmnopqrstuvwxyz"
-    r"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    r"0123456789"
-    r"!@#\$%\^&\*\(\)_\+{}\|:<>\?\[\];',\./`~ "
-)
+# Printable ASCII minus `"` and `\`, expressed as byte ranges so the derived
+# FSM has far fewer transitions than an alternation over ~90 literal chars.
+UNESCAPED_STRING_CHARS = r"\x20-\x21\x23-\x5b\x5d-\x7e"
 ALL_STRING_CHARS = UNESCAPED_STRING_CHARS + r"\\\""
 YAML_START_MARKER = "\n```yaml\n"
 YAML_END_MARKER = "\n```"
 
+# Indentation strings by nesting depth, precomputed for the grammar build.
+_INDENT = tuple("  " * i for i in range(64))
+
+
+def _indent(depth: int) -> str:
+    """
+    Returns the indentation string for a nesting depth.
+
+    Args:
+    - depth: The nesting depth.
+
+    Returns:
+    - Two spaces per level of depth.
+    """
+    if depth < len(_INDENT):
+        return _INDENT[depth]
+    return "  " * depth
+
+
+@functools.lru_cache(maxsize=256)
+def _gen_cached(regex: str) -> Model:
+    """
+    Returns (and caches) a gen node for a regex pattern.
+
+    Args:
+    - regex: The regular expression to generate against.
+
+    Returns:
+    - The gen node, shared between call sites with an identical pattern.
+    """
+    return guidance.gen(regex=regex)
+
+
+@functools.lru_cache(maxsize=256)
+def _select_cached(choices: tuple) -> Model:
+    """
+    Returns (and caches) a select node over a tuple of string choices.
+
+    Args:
+    - choices: The string alternatives to select between.
+
+    Returns:
+    - The select node, shared between call sites with identical choices.
+    """
+    return guidance.select(choices)
+
+
+# The string grammar node is built once at import time rather than per call.
+# The forward slash is escaped so the pattern survives serialization into a
+# slash-delimited lark terminal.
+_string_gen = _gen_cached(
+    rf'"(?:[{UNESCAPED_STRING_CHARS}]|\\["\\\/bfnrt])*"'
+)
+
 
 def set_allowed_chars(chars: str) -> None:
     """
@@ -29,9 +90,15 @@ def set_allowed_chars(chars: str) -> None:
     Args:
     - chars: A string containing the allowed characters.
     """
-    global UNESCAPED_STRING_CHARS, ALL_STRING_CHARS
-    UNESCAPED_STRING_CHARS = "".join(f"\\{x}" for x in chars)
+    global UNESCAPED_STRING_CHARS, ALL_STRING_CHARS, _string_gen
+    UNESCAPED_STRING_CHARS = re.escape(chars)
     ALL_STRING_CHARS = UNESCAPED_STRING_CHARS + r"\\\""
+    _string_gen = _gen_cached(
+        rf'"([{UNESCAPED_STRING_CHARS}]|(\\[{ALL_STRING_CHARS}]))*"'
+    )
+    # Cached grammars embed the old character set, so they must be rebuilt.
+    _field_grammar.cache_clear()
+    _build_grammar.cache_clear()
 
 
 @guidance(stateless=True)
@@ -49,11 +116,10 @@ def generate_str(
     Returns:
     - Model after generating the string
     """
-    return guidance.gen(
-        regex=rf'"([{UNESCAPED_STRING_CHARS}]|(\\[{ALL_STRING_CHARS}]))*"'
-    )
+    return _string_gen
 
 
+@functools.lru_cache(maxsize=256)
 def _escaped(s: str) -> str:
     """
     Escapes a string for use in a regex.
@@ -64,7 +130,21 @@ def _escaped(s: str) -> str:
     Returns:
     - The escaped string.
     """
-    return yaml.dump(s, explicit_end=None).strip()
+    return yaml.dump(s, Dumper=_SafeDumper, explicit_end=None).strip()
+
+
+@functools.lru_cache(maxsize=128)
+def _enum_choices(enum_type: Type[Enum]) -> tuple:
+    """
+    Returns the escaped values of an enumeration, computed once per class.
+
+    Args:
+    - enum_type: The enumeration type to serialize.
+
+    Returns:
+    - A tuple of the escaped member values.
+    """
+    return tuple(_escaped(x.value) for x in enum_type.__members__.values())
 
 
 @guidance(stateless=True)
@@ -80,8 +160,7 @@ def generate_enum(lm: Model, enum_type: Type[Enum], depth: int = 0) -> Model:
     Returns:
     - Model after generating a value from the enumeration.
     """
-    choices = [_escaped(x.value) for x in enum_type.__members__.values()]
-    return guidance.select(choices)
+    return _select_cached(_enum_choices(enum_type))
 
 
 @guidance(stateless=True)
@@ -99,12 +178,7 @@ def generate_bool(
     Returns:
     - Model after generating the boolean.
     """
-    return guidance.select(
-        [
-            "true",
-            "false",
-        ]
-    )
+    return _select_cached(("true", "false"))
 
 
 @guidance(stateless=True)
@@ -122,7 +196,7 @@ def generate_int(
     Returns:
     - Model after generating the integer.
     """
-    return guidance.gen(regex=r"\d+")
+    return _gen_cached(r"\d+")
 
 
 @guidance(stateless=True)
@@ -140,7 +214,7 @@ def generate_float(
     Returns:
     - Model after generating the float.
     """
-    return guidance.gen(regex=r"\-?\d+\.\d+")
+    return _gen_cached(r"\-?\d+\.\d+")
 
 
 @guidance(stateless=True)
@@ -163,6 +237,26 @@ def generate_key_value_pair(
     return key + ": " + value
 
 
+def _canonical_type(field_type: Union[FieldInfo, Type]) -> tuple:
+    """
+    Normalizes a type into a hashable, structurally comparable cache key.
+
+    Args:
+    - field_type: The type to normalize, either as FieldInfo or a Python type.
+
+    Returns:
+    - A key that compares equal for structurally identical types.
+    """
+    if isinstance(field_type, FieldInfo):
+        field_type = field_type.annotation
+    if isinstance(field_type, GenericAlias):
+        return (
+            field_type.__origin__.__name__,
+            tuple(_canonical_type(arg) for arg in field_type.__args__),
+        )
+    return field_type
+
+
 # Cache for key-values generation functions
 _keyvals_cache = {}
 
@@ -180,7 +274,7 @@ def generate_dict_items(value_type: Union[FieldInfo, Type], depth: int = 0) -> M
     - Model after generating the sequence.
     """
     global _keyvals_cache
-    key = (value_type, depth)
+    key = (_canonical_type(value_type), depth)
     if key in _keyvals_cache:
         return _keyvals_cache[key]
 
@@ -189,11 +283,12 @@ def generate_dict_items(value_type: Union[FieldInfo, Type], depth: int = 0) -> M
         if prefix:
             indentation = prefix
         else:
-            indentation = "\n" + "  " * depth
+            indentation = "\n" + _indent(depth)
+        pair = generate_key_value_pair(value_type, depth)
         return guidance.select(
             [
-                indentation + generate_key_value_pair(value_type, depth),
-                indentation + generate_key_value_pair(value_type, depth) + result(),
+                indentation + pair,
+                indentation + pair + result(),
             ]
         )
 
@@ -251,7 +346,7 @@ def generate_list_items(
     - Model after generating the sequence.
     """
     global _items_cache
-    key = (field_info, depth)
+    key = (_canonical_type(field_info), depth)
     if key in _items_cache:
         return _items_cache[key]
 
@@ -260,13 +355,12 @@ def generate_list_items(
         if prefix:
             indentation = prefix + "- "
         else:
-            indentation = "  " * (depth - 1) + "- "
+            indentation = _indent(depth - 1) + "- "
+        item = generate_field_by_type(field_info, depth, prefix=indentation)
         return guidance.select(
             [
-                generate_field_by_type(field_info, depth, prefix=indentation),
-                generate_field_by_type(field_info, depth, prefix=indentation)
-                + "\n"
-                + result(),
+                item,
+                item + "\n" + result(),
             ]
         )
 
@@ -317,59 +411,88 @@ def _compile_context(field_info, depth: int, prefix: str = "") -> str:
     Returns:
     - A formatted string containing the context.
     """
-    indentation = "  " * depth
-    return "\n".join(f"{indentation}# %s" % line for line in field_info.metadata)
+    # Metadata can also hold constraint objects (Gt, MaxLen, ...); only
+    # string entries are instructions meant for the LLM.
+    lines = [line for line in field_info.metadata if isinstance(line, str)]
+    if not lines:
+        return ""
+    line_prefix = _indent(depth) + "# "
+    return "\n".join(line_prefix + line for line in lines)
 
 
-@guidance(stateless=True)
-def generate_field_by_type(
-    lm: Model,
+@functools.lru_cache(maxsize=512)
+def _unwrap_fieldinfo(field_info: FieldInfo) -> tuple:
+    """
+    Extracts (and caches) the requiredness and annotation of a FieldInfo.
+
+    Args:
+    - field_info: The field information to unwrap.
+
+    Returns:
+    - A (is_required, annotation) pair.
+    """
+    return (field_info.is_required(), field_info.annotation)
+
+
+# Dispatch table for the scalar types, checked before the slower
+# isinstance/issubclass branches.
+_TYPE_DISPATCH = {
+    int: generate_int,
+    float: generate_float,
+    str: generate_str,
+    bool: generate_bool,
+}
+
+# Dispatch table for generic container origins.
+_ORIGIN_DISPATCH = {
+    dict: generate_dict,
+    list: generate_list,
+    tuple: generate_list,
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def _field_grammar(
     field_type: Union[FieldInfo, Type],
     depth: int,
     prefix: str = "",
-    skip_keys={},
+    skip_keys: frozenset = frozenset(),
 ) -> Model:
     """
-    Generates a field based on its type.
+    Builds (and caches) the grammar node for a field type.
 
     Args:
-    - language_model: The language model used for parsing.
     - field_type: The type of the field, either as FieldInfo or a Python type.
-    - nesting_level: The current nesting level for indentation purposes.
+    - depth: The current nesting level for indentation purposes.
+    - prefix: An optional prefix to prepend to the field.
+    - skip_keys: Field names to skip when generating nested objects.
 
     Returns:
-    - Model after generating the field.
+    - The grammar node for generating the field.
     """
     is_required = True
     parsed_result = None
 
     if isinstance(field_type, FieldInfo):
-        is_required = field_type.is_required()
-        field_type = field_type.annotation
-
-    if isinstance(field_type, GenericAlias):
-        if field_type.__origin__ == dict:
-            parsed_result = generate_dict(field_type, depth, prefix)
-        elif field_type.__origin__ == list:
-            parsed_result = generate_list(field_type, depth, prefix)
+        is_required, field_type = _unwrap_fieldinfo(field_type)
+
+    handler = _TYPE_DISPATCH.get(field_type)
+    if handler is not None:
+        parsed_result = prefix + handler(field_type, depth)
+    elif isinstance(field_type, GenericAlias):
+        builder = _ORIGIN_DISPATCH.get(field_type.__origin__)
+        if builder is not None:
+            parsed_result = builder(field_type, depth, prefix)
     elif isinstance(field_type, _UnionGenericAlias):
         union_options = []
         for union_arg in field_type.__args__:
-            if union_arg == NoneType:
+            if union_arg is NoneType:
                 is_required = False
             else:
                 union_options.append(generate_field_by_type(union_arg, depth))
         parsed_result = guidance.select(union_options)
     elif isinstance(type(field_type), type):
-        if field_type == int:
-            parsed_result = prefix + generate_int(field_type, depth)
-        elif field_type == float:
-            parsed_result = prefix + generate_float(field_type, depth)
-        elif field_type == str:
-            parsed_result = prefix + generate_str(field_type, depth)
-        elif field_type == bool:
-            parsed_result = prefix + generate_bool(field_type, depth)
-        elif issubclass(field_type, BaseModel):
+        if issubclass(field_type, BaseModel):
             parsed_result = generate_basemodel(field_type, depth, prefix, skip_keys)
         elif issubclass(field_type, Enum):
             parsed_result = prefix + generate_enum(field_type, depth)
@@ -387,6 +510,88 @@ def generate_field_by_type(
         )
 
 
+@guidance(stateless=True)
+def generate_field_by_type(
+    lm: Model,
+    field_type: Union[FieldInfo, Type],
+    depth: int,
+    prefix: str = "",
+    skip_keys={},
+) -> Model:
+    """
+    Generates a field based on its type.
+
+    Args:
+    - language_model: The language model used for parsing.
+    - field_type: The type of the field, either as FieldInfo or a Python type.
+    - nesting_level: The current nesting level for indentation purposes.
+
+    Returns:
+    - Model after generating the field.
+    """
+    return _field_grammar(field_type, depth, prefix, frozenset(skip_keys))
+
+
+@functools.lru_cache(maxsize=256)
+def _fields_of(pydantic_class: Type[BaseModel]) -> tuple:
+    """
+    Returns the (name, FieldInfo) pairs of a pydantic class, computed once.
+
+    Args:
+    - pydantic_class: The pydantic class to inspect.
+
+    Returns:
+    - A tuple of (field_name, field_info) pairs.
+    """
+    return tuple(pydantic_class.model_fields.items())
+
+
+@functools.lru_cache(maxsize=256)
+def _basemodel_template(
+    pydantic_class: Type[BaseModel],
+    depth: int,
+    prefix: str = "",
+    skip_keys: frozenset = frozenset(),
+) -> tuple:
+    """
+    Pre-renders the static text surrounding each field of a pydantic class.
+
+    Args:
+    - pydantic_class: The pydantic class to render.
+    - depth: The current nesting level for indentation purposes.
+    - prefix: An optional prefix to prepend to the first field.
+    - skip_keys: Field names to leave out.
+
+    Returns:
+    - A tuple of (static_text, field_info) pairs, with comments, indentation
+      and the "name: " label baked into the static text.
+    """
+    parts = []
+    first = True
+
+    for field_name, field_info in _fields_of(pydantic_class):
+        if field_name in skip_keys:
+            continue
+
+        if first and prefix:
+            indentation = prefix
+        elif first and depth == 0:
+            indentation = _indent(depth)
+        else:
+            indentation = "\n" + _indent(depth)
+
+        comment = _compile_context(field_info, depth)
+        if comment:
+            static = "\n" + comment + "\n" + indentation.lstrip("\n")
+        else:
+            static = indentation
+
+        parts.append((f"{static}{field_name}: ", field_info))
+        first = False
+
+    return tuple(parts)
+
+
 @guidance(stateless=True)
 def generate_basemodel(
     lm: Model,
@@ -409,36 +614,130 @@ def generate_basemodel(
     if isinstance(pydantic_class, FieldInfo):
         pydantic_class = pydantic_class.annotation
 
-    if prefix:
-        indentation = prefix
-    elif depth == 0:
-        indentation = "  " * depth
-    else:
-        indentation = "\n" + "  " * depth
+    template = _basemodel_template(pydantic_class, depth, prefix, frozenset(skip_keys))
 
-    parsed_result = ""
-    trailing_newline = False
+    parts = []
+    for static_text, field_info in template:
+        parts.append(static_text)
+        parts.append(generate_field_by_type(field_info, depth + 1))
+
+    if not parts:
+        return ""
+    return functools.reduce(operator.add, parts)
+
+
+# Cache for serialized pre-filled fields, keyed by their json form
+_yaml_prefill_cache = {}
 
-    for field_name, field_info in pydantic_class.model_fields.items():
-        if field_name in skip_keys:
-            continue
-        comment = _compile_context(field_info, depth)
-        if comment:
-            if not trailing_newline:
-                parsed_result += "\n"
-            parsed_result += comment + "\n"
-            trailing_newline = True
 
-        if trailing_newline:
-            indentation = indentation.lstrip("\n")
+def _dump_prefill(kwargs: dict) -> str:
+    """
+    Serializes (and caches) the pre-filled fields as yaml.
+
+    Args:
+    - kwargs: The pre-filled field values, already converted to plain dicts.
+
+    Returns:
+    - The yaml serialization of the fields.
+    """
+    global _yaml_prefill_cache
+    try:
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+    except TypeError:
+        return yaml.dump(kwargs, Dumper=_SafeDumper, explicit_end=None)
+
+    if key not in _yaml_prefill_cache:
+        if len(_yaml_prefill_cache) >= 128:
+            _yaml_prefill_cache.clear()
+        _yaml_prefill_cache[key] = yaml.dump(
+            kwargs, Dumper=_SafeDumper, explicit_end=None
+        )
+    return _yaml_prefill_cache[key]
 
-        parsed_result += f"{indentation}{field_name}: "
-        parsed_result += generate_field_by_type(field_info, depth + 1)
-        trailing_newline = False
 
-        indentation = "\n" + "  " * depth
+@functools.lru_cache(maxsize=128)
+def _build_grammar(pydantic_class: Type[BaseModel], skip_keys: frozenset) -> Model:
+    """
+    Builds (and caches) the guidance grammar for a pydantic class.
+
+    Args:
+    - pydantic_class: The pydantic class to build the grammar for.
+    - skip_keys: The pre-filled field names to skip during generation.
+
+    Returns:
+    - The grammar node for generating the class.
+    """
+    return generate_field_by_type(pydantic_class, 0, skip_keys=skip_keys)
+
+
+class GuidanceExtractor:
+    """
+    Precompiles the grammar for a pydantic class so repeated extractions
+    only pay for the LM append and the yaml parse.
+    """
+
+    def __init__(self, pydantic_class: Type[BaseModel]) -> None:
+        """
+        Args:
+        - pydantic_class: The pydantic class defining the structure of the
+          objects to be extracted.
+        """
+        self.pydantic_class = pydantic_class
+        # Warm the grammar cache; prefill variants are built on first use.
+        _build_grammar(pydantic_class, frozenset())
 
-    return parsed_result
+    def extract(self, lm: Model, **kwargs) -> Tuple[Model, BaseModel]:
+        """
+        Generates a pydantic object.
+
+        Args:
+        - lm: The language model used to generate the instructions.
+        - kwargs: Pre-filled field values to inject before generation.
+
+        Returns:
+        - Model after generating a yaml config of the object.
+        - The object generated from the pydantic class.
+        """
+        lm += YAML_START_MARKER
+
+        # Everything appended from here until the end marker is the yaml
+        # payload; record the offset now instead of scanning the transcript
+        # for it later.
+        start_idx = len(str(lm))
+
+        # Fill in the pre-filled fields
+        if kwargs:
+            kwargs = kwargs.copy()
+            # Convert any BaseModel objects to a dict
+            for key, value in kwargs.items():
+                if isinstance(value, BaseModel):
+                    kwargs[key] = value.model_dump()
+
+            # Dump the kwargs into yaml
+            yaml_content = _dump_prefill(kwargs)
+
+            # Add the yaml content to the generation result
+            lm += f"{yaml_content}"
+
+        # Generate the rest of the fields
+        lm += _build_grammar(self.pydantic_class, frozenset(kwargs)) + YAML_END_MARKER
+
+        # Extract the yaml content
+        generation_output = str(lm)
+        yaml_content = generation_output[start_idx : -len(YAML_END_MARKER)]
+        dict_content = yaml.load(yaml_content, Loader=_SafeLoader)
+
+        # Create the pydantic object
+        if issubclass(self.pydantic_class, BaseModel):
+            pydantic_object = self.pydantic_class.model_validate(dict_content)
+        else:
+            pydantic_object = dict_content
+
+        return lm, pydantic_object
+
+
+# Cache for extractors created through generate_object
+_extractor_cache = {}
 
 
 def generate_object(
@@ -455,36 +754,10 @@ def generate_object(
     - Model after generating a yaml config of the object.
     - The object generated from the specified Pydantic class.
     """
-    lm += YAML_START_MARKER
-
-    # Fill in the pre-filled fields
-    if kwargs:
-        kwargs = kwargs.copy()
-        # Convert any BaseModel objects to a dict
-        for key, value in kwargs.items():
-            if isinstance(value, BaseModel):
-                kwargs[key] = value.model_dump()
-
-        # Dump the kwargs into yaml
-        yaml_content = yaml.dump(kwargs, explicit_end=None)
-
-        # Add the yaml content to the generation result
-        lm += f"{yaml_content}"
-
-    # Generate the rest of the fields
-    lm += generate_field_by_type(pydantic_class, 0, skip_keys=kwargs) + YAML_END_MARKER
-
-    # Extract the yaml content
-    generation_output = str(lm)
-    start_idx = generation_output.rfind(YAML_START_MARKER) + len(YAML_START_MARKER)
-    end_idx = generation_output.rfind(YAML_END_MARKER)
-    yaml_content = generation_output[start_idx:end_idx]
-    dict_content = yaml.safe_load(yaml_content)
-
-    # Create the pydantic object
-    if issubclass(pydantic_class, BaseModel):
-        pydantic_object = pydantic_class(**dict_content)
-    else:
-        pydantic_object = dict_content
-
-    return lm, pydantic_object
+    global _extractor_cache
+    extractor = _extractor_cache.get(pydantic_class)
+    if extractor is None:
+        extractor = _extractor_cache[pydantic_class] = GuidanceExtractor(
+            pydantic_class
+        )
+    return extractor.extract(lm, **kwargs)
@@ -3,7 +3,7 @@ from typing import Optional
 from typing_extensions import Annotated
 
 import guidance
-from guidance_instructor import generate_object
+from guidance_instructor import GuidanceExtractor, generate_object
 from pydantic import BaseModel
 
 
@@ -58,6 +58,44 @@ def test_field_instructions(model):
     assert obj.fruits == ["APPLES", "ORANGES"]
 
 
+def test_extractor_reuse(model):
+    class SimpleClass(BaseModel):
+        name: Annotated[str, "Provide a name."]
+        age: Annotated[int, "Provide an age in years."]
+
+    extractor = GuidanceExtractor(SimpleClass)
+
+    for name, age in [("Jack", 30), ("Jill", 25)]:
+        with guidance.user():
+            lm = (
+                model
+                + f"Extract the following into an object: {name} is {age} years old."
+            )
+
+        with guidance.assistant():
+            lm, obj = extractor.extract(lm)
+
+        assert obj.name.lower() == name.lower()
+        assert obj.age == age
+
+
+def test_extractor_prefilled_fields(model):
+    class SimpleClass(BaseModel):
+        name: Annotated[str, "Provide a name."]
+        age: Annotated[int, "Provide an age in years."]
+
+    extractor = GuidanceExtractor(SimpleClass)
+
+    with guidance.user():
+        lm = model + "Extract the following into an object: Jack is 30 years old."
+
+    with guidance.assistant():
+        lm, obj = extractor.extract(lm, name="Jack")
+
+    assert obj.name == "Jack"
+    assert obj.age == 30
+
+
 def test_extract_complex_object(model):
     class Story(BaseModel):
         summary: str